@@ -7,8 +7,11 @@ import subprocess
 import sys
 import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, List, Optional, Tuple
 
+import requests
+
 from process.process_utils import format_command
 from . import client_output
 
@@ -111,6 +114,7 @@ class Client:
         self._client = client
         self._admin_client = admin_client
         self.rpc_port = rpc_port
+        self.endpoint = endpoint
 
     def run_generic(
         self,
@@ -208,6 +212,34 @@ class Client:
         compl_pr = self.run(params)
         return client_output.extract_rpc_answer(compl_pr)
 
+    def rpc_batch(self, rpcs: List[Tuple]) -> List[requests.Response]:
+        """Run a batch of independent RPC commands against the node.
+
+        The node's RPC interface is plain REST and has no batch
+        endpoint, so the requests are issued concurrently, directly to
+        the node's endpoint: a batch of N small requests costs roughly
+        one round-trip instead of N. Errors are reported per element of
+        the batch, as the corresponding `Response` object.
+
+        Args:
+            rpcs (list): list of (verb, path) or (verb, path, data)
+                         tuples, with the same meaning as for `rpc`
+        Returns:
+            The list of `requests.Response` objects, in the order of
+            `rpcs`.
+        """
+        assert self.endpoint is not None
+
+        def call(rpc: Tuple) -> requests.Response:
+            verb, path, *data = rpc
+            assert verb in {'put', 'get', 'post', 'delete', 'patch'}
+            url = self.endpoint + '/' + path.lstrip('/')
+            print(f'# calling RPC {verb} {url}')
+            return requests.request(verb, url, json=data[0] if data else None)
+
+        with ThreadPoolExecutor(max_workers=len(rpcs)) as executor:
+            return list(executor.map(call, rpcs))
+
     def remember_contract(
         self, alias: str, contract_address: str, force: bool = False
     ):
@@ -583,6 +615,29 @@ class Client:
         res = self.run(cmd)
         return client_output.TransferResult(res)
 
+    def transfer_many(
+        self,
+        giver: str,
+        dests: List[Tuple[float, str]],
+        args: List[str] = None,
+    ) -> client_output.TransferResult:
+        """Transfer to several destinations in a single batched operation.
+
+        `dests` is a list of (amount, receiver) couples. Compared to one
+        `transfer` call per destination, all the transfers are part of a
+        single operation, so a single bake includes them all.
+        """
+        json_obj = [
+            {"destination": receiver, "amount": str(amount)}
+            for amount, receiver in dests
+        ]
+        json_ops = json.dumps(json_obj, separators=(',', ':'))
+        if args is None:
+            args = []
+        cmd = self.cmd_batch(giver, json_ops) + args
+        res = self.run(cmd)
+        return client_output.TransferResult(res)
+
     def call(
         self, source: str, destination: str, args: List[str] = None
     ) -> client_output.TransferResult:
@@ -20,7 +20,7 @@ from pytest_regtest import (
     deregister_converter_pre,
     _std_conversion,
 )
-from launchers.sandbox import Sandbox
+from launchers.sandbox import Sandbox, worker_log_dir, worker_ports
 from tools import constants, paths, utils
 from tools.client_regression import ClientRegression
 from tools.utils import bake
@@ -82,12 +82,20 @@ You can investigate daemon logs by running this test using the
 def sandbox(log_dir: Optional[str], singleprocess: bool) -> Iterator[Sandbox]:
     """Sandboxed network of nodes.
 
-    Nodes, bakers and endorsers are added/removed dynamically."""
+    Nodes, bakers and endorsers are added/removed dynamically.
+
+    Under pytest-xdist, each worker uses its own port range (and its
+    own subdirectory of the log directory), so that sandboxes running
+    in parallel don't collide."""
     # log_dir is None if not provided on command-line
     # singleprocess is false if not provided on command-line
+    rpc, p2p = worker_ports()
+    log_dir = worker_log_dir(log_dir)
     with Sandbox(
         paths.TEZOS_HOME,
         constants.IDENTITIES,
+        rpc=rpc,
+        p2p=p2p,
         log_dir=log_dir,
         singleprocess=singleprocess,
     ) as sandbox:
@@ -1,6 +1,7 @@
 from typing import List, Dict
 import os
 import subprocess
+import tempfile
 from process import process_utils
 
 
@@ -33,7 +34,8 @@ class Baker(subprocess.Popen):
             accounts (List[str]): delegates accounts
             params (list): additional parameters to be added to the command
             log_levels (dict): log levels. e.g. {"p2p.connection-pool":"debug"}
-            log_file (str): log file name (optional)
+            log_file (str): log file name (optional, a temporary file
+                            is used if not given)
         Returns:
             A Popen instance
         """
@@ -57,6 +59,12 @@ class Baker(subprocess.Popen):
             env['TEZOS_LOG'] = lwt_log
         cmd_string = process_utils.format_command(cmd)
         print(cmd_string)
+        if log_file is None:
+            # always keep a log: the sandbox reads it to detect when
+            # the baker is ready
+            file_desc, log_file = tempfile.mkstemp(prefix='tezos-baker-log.')
+            os.close(file_desc)
+        self.log_file = log_file
         stdout, stderr = process_utils.prepare_log(cmd, log_file)
         subprocess.Popen.__init__(
             self, cmd, stdout=stdout, env=env, stderr=stderr
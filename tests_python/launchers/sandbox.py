@@ -1,6 +1,9 @@
+import json
 import os
 import time
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
 
 from client.client import Client
 from daemons.baker import Baker
@@ -15,6 +18,44 @@ BAKER = 'tezos-baker'
 ENDORSER = 'tezos-endorser'
 ACCUSER = 'tezos-accuser'
 
+# Base ports used by a sandbox when the caller doesn't choose them, and
+# the number of ports a sandbox may use above each base (one per peer).
+RPC_PORT_BASE = 18730
+P2P_PORT_BASE = 19730
+NUM_PORTS = 45
+
+
+def worker_ports() -> Tuple[int, int]:
+    """Base RPC and P2P ports for the sandboxes of this process.
+
+    Under pytest-xdist, each worker is given a disjoint port range so
+    that sandboxes running in parallel workers don't collide on the
+    node ports. Each worker owns ``2 * NUM_PORTS`` consecutive ports
+    above ``RPC_PORT_BASE``: the first half for RPC, the second half
+    for P2P, so the ranges of two workers can never intersect.
+    """
+    worker = os.environ.get('PYTEST_XDIST_WORKER', '')
+    # worker names are 'gw0', 'gw1', ...
+    worker_id = int(worker[2:]) if worker.startswith('gw') else 0
+    rpc = RPC_PORT_BASE + worker_id * 2 * NUM_PORTS
+    return rpc, rpc + NUM_PORTS
+
+
+def worker_log_dir(log_dir: Optional[str]) -> Optional[str]:
+    """Log directory for the sandboxes of this process.
+
+    Under pytest-xdist, each worker logs under its own subdirectory of
+    `log_dir`, created if needed, so that sandboxes running in parallel
+    workers don't write to the same files. Without pytest-xdist (or
+    without a log directory), `log_dir` is returned unchanged.
+    """
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if log_dir is None or worker is None:
+        return log_dir
+    log_dir = os.path.join(log_dir, worker)
+    os.makedirs(log_dir, exist_ok=True)
+    return log_dir
+
 
 class Sandbox:
     """A Sandbox manages a set of clients, nodes and daemons running in
@@ -54,9 +95,9 @@ class Sandbox:
         self,
         binaries_path: str,
         identities: Dict[str, Dict[str, str]],
-        rpc: int = 18730,
-        p2p: int = 19730,
-        num_peers: int = 45,
+        rpc: int = RPC_PORT_BASE,
+        p2p: int = P2P_PORT_BASE,
+        num_peers: int = NUM_PORTS,
         log_dir: str = None,
         singleprocess: bool = False,
     ):
@@ -397,8 +438,9 @@ class Sandbox:
             branch (str): see branch parameter for `add_node()`
         """
         assert node_id in self.nodes, f'No node running with id={node_id}'
-        if proto not in self.bakers:
-            self.bakers[proto] = {}
+        # setdefault is atomic: add_baker may be called from several
+        # threads at once when the bakers are started concurrently
+        self.bakers.setdefault(proto, {})
         assert_msg = f'Already a baker for proto={proto} and id={node_id}'
         assert node_id not in self.bakers[proto], assert_msg
         baker_path = self._wrap_path(BAKER, branch, proto)
@@ -579,6 +621,76 @@ class Sandbox:
         (no particular order)."""
         return list(self.clients.values())
 
+    def wait_for_level(
+        self, min_level: int, timeout: float = 60, node_id: int = 0
+    ) -> int:
+        """Wait for a node to reach a given level.
+
+        Streams the node's `/monitor/heads/main` RPC and returns as
+        soon as a head of level at least `min_level` is seen, instead
+        of sleeping for a worst-case duration. The current head is
+        notified first, so an already reached level returns
+        immediately.
+
+        Args:
+            min_level (int): the level to wait for
+            timeout (float): maximal time to wait, in seconds
+            node_id (int): id of the node to monitor
+        Returns:
+            The level of the first head at or above `min_level`.
+        """
+        node = self.nodes[node_id]
+        url = f'http://localhost:{node.rpc_port}/monitor/heads/main'
+        deadline = time.time() + timeout
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                assert time.time() < deadline, (
+                    f'node {node_id} did not reach level {min_level} '
+                    f'within {timeout} seconds'
+                )
+                if not line:
+                    continue
+                level = int(json.loads(line)['level'])
+                if level >= min_level:
+                    return level
+        assert False, f'head stream of node {node_id} ended unexpectedly'
+
+    def wait_for_baker_ready(
+        self, node_id: int, proto: str, timeout: float = 10
+    ) -> None:
+        """Wait for the baker attached to a node to be up and running.
+
+        The baker daemons expose no RPC of their own, so readiness is
+        detected from the daemon's log, polled every 0.1s. The baker
+        reports that it waits for the protocol to start once it is
+        bootstrapped with its node, and that it has started once the
+        protocol is active; either way it is ready to take part in
+        consensus as soon as the protocol is.
+
+        Args:
+            node_id (int): id of the node the baker is attached to
+            proto (str): name of the protocol, as for `add_baker()`
+            timeout (float): maximal time to wait, in seconds
+        """
+        baker = self.bakers[proto][node_id]
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            assert (
+                baker.poll() is None
+            ), f'baker for node {node_id} terminated unexpectedly'
+            with open(baker.log_file, 'r') as log:
+                contents = log.read()
+            if 'Baker started.' in contents or (
+                'Waiting for protocol' in contents
+            ):
+                return
+            time.sleep(0.1)
+        assert False, (
+            f'baker for node {node_id} still not ready after '
+            f'{timeout} seconds'
+        )
+
     def all_nodes(self) -> List[Node]:
         """ Returns the list of all active nodes (no particular order)."""
         return list(self.nodes.values())
@@ -650,9 +762,9 @@ class SandboxMultiBranch(Sandbox):
         binaries_path: str,
         identities: Dict[str, Dict[str, str]],
         branch_map: Dict[int, str],
-        rpc: int = 18730,
-        p2p: int = 19730,
-        num_peers: int = 45,
+        rpc: int = RPC_PORT_BASE,
+        p2p: int = P2P_PORT_BASE,
+        num_peers: int = NUM_PORTS,
         log_dir: str = None,
         singleprocess: bool = False,
     ):
@@ -1,11 +1,13 @@
 """Protocol-specific hooks and fixtures"""
 
-import tempfile
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional, Iterator, List
 import pytest
-from launchers.sandbox import Sandbox
-from tools import constants, utils
+from launchers.sandbox import Sandbox, worker_log_dir, worker_ports
+from tools import constants, paths, utils
 from tools.client_regression import ClientRegression
 from client.client import Client
 from client.client_output import CreateMockupResult
@@ -13,26 +15,82 @@ from client.client_output import CreateMockupResult
 from . import protocol
 
 
+@pytest.fixture(scope="session")
+def sandbox_template(log_dir, singleprocess, tmp_path_factory) -> str:
+    """Data directory of a node with protocol alpha already activated.
+
+    Bootstrapping a node and activating the protocol is the expensive
+    part of the class-scoped fixtures below. It is paid once per
+    session here: the client fixtures then start their node from a copy
+    of this directory instead of bootstrapping a chain from scratch.
+
+    The protocol is activated one year in the past. This avoids waiting
+    when baking blocks manually from the client using `bake for`.
+    """
+    template_dir = str(tmp_path_factory.mktemp('sandbox-template'))
+    rpc, p2p = worker_ports()
+    with Sandbox(
+        paths.TEZOS_HOME,
+        constants.IDENTITIES,
+        rpc=rpc,
+        p2p=p2p,
+        log_dir=worker_log_dir(log_dir),
+        singleprocess=singleprocess,
+    ) as sandbox:
+        sandbox.add_node(0, params=constants.NODE_PARAMS)
+        parameters = protocol.get_parameters()
+        parameters['consensus_threshold'] = 0
+        protocol.activate(
+            sandbox.client(0),
+            parameters=parameters,
+            activate_in_the_past=True,
+        )
+        node = sandbox.node(0)
+        # the node must be stopped before copying its data directory
+        node.terminate_or_kill()
+        shutil.copytree(node.node_dir, template_dir, dirs_exist_ok=True)
+    return template_dir
+
+
+def _node_dir_from_template(tmp_path_factory, template_dir: str) -> str:
+    """A fresh node data directory seeded from the session template.
+
+    Only the chain data is kept: the identity and configuration files
+    are regenerated when the node is added, with the ports of the new
+    node.
+    """
+    node_dir = str(tmp_path_factory.mktemp('node'))
+    shutil.copytree(template_dir, node_dir, dirs_exist_ok=True)
+    for name in ('identity.json', 'config.json'):
+        path = os.path.join(node_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+    return node_dir
+
+
 @pytest.fixture(scope="class")
-def client(sandbox: Sandbox) -> Iterator[Client]:
+def client(
+    sandbox: Sandbox, sandbox_template: str, tmp_path_factory
+) -> Iterator[Client]:
     """One node with protocol alpha.
 
-    Activate protocol alpha one year in the past. This avoids waiting
-    when baking blocks manually from the client using `bake for`
+    The node starts from a copy of the session template, in which
+    protocol alpha was activated one year in the past (see the
+    `sandbox_template` fixture).
     """
-    sandbox.add_node(0, params=constants.NODE_PARAMS)
-    client = sandbox.client(0)
-    parameters = protocol.get_parameters()
-    parameters['consensus_threshold'] = 0
-    protocol.activate(client, parameters=parameters, activate_in_the_past=True)
-    yield client
+    node_dir = _node_dir_from_template(tmp_path_factory, sandbox_template)
+    sandbox.add_node(0, node_dir=node_dir, params=constants.NODE_PARAMS)
+    yield sandbox.client(0)
 
 
 @pytest.fixture(scope="class")
-def client_regtest_bis(sandbox: Sandbox) -> Iterator[Client]:
+def client_regtest_bis(
+    sandbox: Sandbox, sandbox_template: str, tmp_path_factory
+) -> Iterator[Client]:
     """One node with protocol alpha, regression test enabled.
 
-    Activate protocol alpha one year in the past. (see fixture client).
+    Starts from the session template with protocol alpha activated one
+    year in the past. (see fixture client).
     """
 
     def reg_client_factory(
@@ -59,14 +117,14 @@ def client_regtest_bis(sandbox: Sandbox) -> Iterator[Client]:
         )
         return client
 
+    node_dir = _node_dir_from_template(tmp_path_factory, sandbox_template)
     sandbox.add_node(
-        1, client_factory=reg_client_factory, params=constants.NODE_PARAMS
+        1,
+        node_dir=node_dir,
+        client_factory=reg_client_factory,
+        params=constants.NODE_PARAMS,
     )
-    client = sandbox.client(1)
-    parameters = protocol.get_parameters()
-    parameters['consensus_threshold'] = 0
-    protocol.activate(client, activate_in_the_past=True, parameters=parameters)
-    yield client
+    yield sandbox.client(1)
 
 
 @pytest.fixture(scope="class")
@@ -80,9 +138,15 @@ def clients(sandbox: Sandbox, request) -> Iterator[List[Client]]:
     """
     assert request.param is not None
     num_nodes = request.param
-    for i in range(num_nodes):
-        # Large number may increases peers connection time
-        sandbox.add_node(i, params=constants.NODE_PARAMS)
+    # nodes are independent, add them concurrently
+    # Large number may increases peers connection time
+    with ThreadPoolExecutor(max_workers=num_nodes) as executor:
+        futures = [
+            executor.submit(sandbox.add_node, i, params=constants.NODE_PARAMS)
+            for i in range(num_nodes)
+        ]
+        for future in futures:
+            future.result()
     parameters = protocol.get_parameters()
     parameters['consensus_threshold'] = 0
     parameters['round_durations'] = ['1', '1']
@@ -98,7 +162,7 @@ def clients(sandbox: Sandbox, request) -> Iterator[List[Client]]:
 
 
 @pytest.fixture
-def mockup_client(sandbox: Sandbox) -> Iterator[Client]:
+def mockup_client(sandbox: Sandbox, tmp_path_factory) -> Iterator[Client]:
     """
     Returns a mockup client with its persistent directory created
 
@@ -112,45 +176,59 @@ def mockup_client(sandbox: Sandbox) -> Iterator[Client]:
     a mockup using custom arguments; you MUST do the same
     as this method.
     """
-    with tempfile.TemporaryDirectory(prefix='tezos-client.') as base_dir:
-        unmanaged_client = sandbox.create_client(base_dir=base_dir)
-        res = unmanaged_client.create_mockup(
-            protocol=protocol.HASH
-        ).create_mockup_result
-        assert res == CreateMockupResult.OK
-        yield sandbox.create_client(base_dir=base_dir, mode="mockup")
+    base_dir = str(tmp_path_factory.mktemp('tezos-client'))
+    unmanaged_client = sandbox.create_client(base_dir=base_dir)
+    res = unmanaged_client.create_mockup(
+        protocol=protocol.HASH
+    ).create_mockup_result
+    assert res == CreateMockupResult.OK
+    yield sandbox.create_client(base_dir=base_dir, mode="mockup")
 
 
 @pytest.fixture(scope="class")
-def nodes_legacy_store(sandbox, legacy_stores):
+def nodes_legacy_store(sandbox, legacy_stores, tmp_path_factory, request):
+    """Nodes registered on top of the legacy stores.
+
+    By default, one node is set up per history mode. Tests that only
+    exercise some of the modes can restrict the setup to those, and
+    avoid paying for the others, with indirect parameterization:
+
+    @pytest.mark.parametrize(
+        'nodes_legacy_store', [['rolling']], indirect=True
+    )
+
+    Yields a dict from history mode to node; nodes are numbered from 1
+    in the order of the requested modes.
+    """
+    history_modes = getattr(request, 'param', None)
+    if history_modes is None:
+        history_modes = ['archive', 'full', 'rolling']
     nodes = {}
 
     # TODO would be cleaner to return couples (node, client) in order to
     #      avoid relying on the invariant that nodes are numbered 1, 2, 3
     #      or just return the id?
     i = 1
-    for history_mode in ['archive', 'full', 'rolling']:
-        node_dir = legacy_stores[f'{history_mode}_path']
+    for history_mode in history_modes:
+        # each node runs on its own copy of the legacy store, in a
+        # pytest-managed temporary directory
+        node_dir = str(tmp_path_factory.mktemp(f'legacy_{history_mode}'))
+        shutil.copytree(
+            legacy_stores[f'{history_mode}_path'],
+            node_dir,
+            dirs_exist_ok=True,
+        )
         # init config with up to date version
         params = constants.NODE_PARAMS + ['--history-mode', history_mode]
         node = sandbox.register_node(i, node_dir=node_dir, params=params)
         # Workaround to allow generating an identity on an
         # old 0.0.4 storage with a 0.0.6 node
-        version = open(node_dir + "/version.json", "w")
-        version.write('{ "version": "0.0.6" }')
-        version.close()
+        Path(node_dir, "version.json").write_text('{ "version": "0.0.6" }')
         node.init_config()
         # write version to upgrade
-        version = open(node_dir + "/version.json", "w")
-        version.write('{ "version": "0.0.4" }')
-        version.close()
+        Path(node_dir, "version.json").write_text('{ "version": "0.0.4" }')
 
         nodes[history_mode] = node
         i += 1
 
     yield nodes
-
-    # TODO think of case of failure before `yield`
-    for history_mode in ['archive', 'full', 'rolling']:
-        node_dir = legacy_stores[f'{history_mode}_path']
-        shutil.rmtree(node_dir)
@@ -53,6 +53,18 @@ def get_parameters(protocol: Optional[Protocol] = Protocol.CURRENT):
     )
 
 
+def get_tenderbake_parameters():
+    """
+    Returns:
+      A fresh copy of the tenderbake protocol parameters
+
+    The parameters JSON is parsed once at import time (see
+    tools.constants); callers only pay for the copy, which they are
+    free to mutate.
+    """
+    return deepcopy(TENDERBAKE_PARAMETERS)
+
+
 def get_now(client) -> str:
     """Returns the timestamp of next-to-last block,
     offset by the minimum time between blocks"""
@@ -11,6 +11,44 @@ from .contract_paths import CONTRACT_PATH
 BAKE_ARGS: List[str] = []
 TRANSFER_ARGS = ['--burn-cap', '0.257']
 
+# Arguments of the operation-size tests, built once at module import
+# rather than in every test invocation: the nat ones in particular are
+# large bignums that are expensive to recompute.
+
+# Each pair of braces is encoded on 5 bytes so this takes
+# 5 * 6 * 1024 = 30 KB < 32KB
+LAMBDA_ARG_OK = ("{" * 6 * 1024) + ("}" * 6 * 1024)
+# Each pair of braces is encoded on 5 bytes so this takes
+# 5 * 7 * 1024 = 35 KB > 32KB
+LAMBDA_ARG_FAIL = ("{" * 7 * 1024) + ("}" * 7 * 1024)
+# Each element in the list takes 2 bytes so about 30KB in total
+LIST_ARG_OK = "{" + ("0; " * 15 * 1024) + "}"
+LIST_ARG_SYNTAX_ERROR = "{" + ("0; " * 15 * 1024) + "'foo;'" + "}"
+LIST_ARG_ILL_TYPED = "{" + ("0; " * 15 * 1024) + "Unit;" + "}"
+# Each element in the list takes 2 bytes so about 34KB in total
+LIST_ARG_FAIL = "{" + ("0; " * 17 * 1024) + "}"
+# The encoding for nat uses a byte to encode 7 bits of the number
+# so the size of 2 ** (7 * n) is about n bytes
+NAT_ARG_OK = 2 ** (7 * 30 * 1024)
+NAT_ARG_FAIL = 2 ** (7 * 33 * 1024)
+
+
+def balances_mutez(client: Client, key_hashes: List[str]) -> List[int]:
+    """Balances (in mutez) of several accounts, in one batched RPC."""
+    responses = client.rpc_batch(
+        [
+            (
+                'get',
+                '/chains/main/blocks/head/context/contracts/'
+                f'{key_hash}/balance',
+            )
+            for key_hash in key_hashes
+        ]
+    )
+    for response in responses:
+        assert response.ok, response.text
+    return [int(response.json()) for response in responses]
+
 
 @pytest.mark.incremental
 class TestRawContext:
@@ -28,24 +66,21 @@ class TestRawContext:
         }
         assert res == expected
 
-    def test_no_service_1(self, client: Client):
-        path = '/chains/main/blocks/head/context/raw/bytes/non-existent'
-        with assert_run_failure('No service found at this URL'):
-            client.rpc('get', path)
-
-    def test_no_service_2(self, client: Client):
-        path = (
-            '/chains/main/blocks/head/context/raw/bytes/'
-            'non-existent?depth=-1'
+    def test_no_service(self, client: Client):
+        # the queries are independent, issue them as a single batch;
+        # errors are reported per element of the batch
+        prefix = '/chains/main/blocks/head/context/raw/bytes/'
+        [no_service, bad_depth, no_service_depth] = client.rpc_batch(
+            [
+                ('get', prefix + 'non-existent'),
+                ('get', prefix + 'non-existent?depth=-1'),
+                ('get', prefix + 'non-existent?depth=0'),
+            ]
         )
-        expected = 'Command failed: Extraction depth -1 is invalid'
-        with assert_run_failure(expected):
-            client.rpc('get', path)
-
-    def test_no_service_3(self, client: Client):
-        path = '/chains/main/blocks/head/context/raw/bytes/non-existent?depth=0'
-        with assert_run_failure('No service found at this URL'):
-            client.rpc('get', path)
+        assert no_service.status_code == 404
+        assert no_service_depth.status_code == 404
+        assert not bad_depth.ok
+        assert 'raw_context.invalid_depth' in bad_depth.text
 
     def test_bake(self, client: Client):
         utils.bake(client, 'bootstrap4')
@@ -162,19 +197,29 @@ class TestRawContext:
         for key, sig in zip(session['keys'], sigs):
             args = [] if sig is None else ['--sig', sig]
             client.gen_key(key, args)
+        # remember the key hashes, used by the batched balance queries
+        session['key_hashes'] = [
+            client.show_address(key).hash for key in session['keys']
+        ]
 
     def test_transfers(self, client: Client, session):
-        client.transfer(1000, 'bootstrap1', session['keys'][0], TRANSFER_ARGS)
-        utils.bake(client)
-        client.transfer(2000, 'bootstrap1', session['keys'][1], TRANSFER_ARGS)
-        utils.bake(client)
-        client.transfer(3000, 'bootstrap1', session['keys'][2], TRANSFER_ARGS)
+        # the transfers are independent: issue them as one batched
+        # operation sealed by a single bake
+        keys = session['keys']
+        client.transfer_many(
+            'bootstrap1',
+            [(1000, keys[0]), (2000, keys[1]), (3000, keys[2])],
+            TRANSFER_ARGS,
+        )
         utils.bake(client)
 
     def test_balances(self, client: Client, session):
-        assert client.get_balance(session['keys'][0]) == 1000
-        assert client.get_balance(session['keys'][1]) == 2000
-        assert client.get_balance(session['keys'][2]) == 3000
+        balances = balances_mutez(client, session['key_hashes'])
+        assert balances == [
+            utils.mutez_of_tez(1000),
+            utils.mutez_of_tez(2000),
+            utils.mutez_of_tez(3000),
+        ]
 
     def test_transfer_bar_foo(self, client: Client, session):
         client.reveal(session['keys'][1], ['--fee', '0', '--force-low-fee'])
@@ -188,8 +233,11 @@ class TestRawContext:
         utils.bake(client)
 
     def test_balances_bar_foo(self, client: Client, session):
-        assert client.get_balance(session['keys'][0]) == 2000
-        assert client.get_balance(session['keys'][1]) == 1000
+        balances = balances_mutez(client, session['key_hashes'][:2])
+        assert balances == [
+            utils.mutez_of_tez(2000),
+            utils.mutez_of_tez(1000),
+        ]
 
     def test_transfer_foo_bar(self, client: Client, session):
         client.reveal(session['keys'][0], ['--fee', '0', '--force-low-fee'])
@@ -200,9 +248,12 @@ class TestRawContext:
         utils.bake(client)
 
     def test_balances_foo_bar(self, client: Client, session):
+        balances = balances_mutez(client, session['key_hashes'][:2])
         # 999.95 = 1000 - transfer fees
-        assert client.get_balance(session['keys'][0]) == 999.95
-        assert client.get_balance(session['keys'][1]) == 2000
+        assert balances == [
+            utils.mutez_of_tez(999.95),
+            utils.mutez_of_tez(2000),
+        ]
 
     def test_transfer_failure(self, client: Client, session):
         with pytest.raises(Exception):
@@ -241,13 +292,14 @@ class TestRawContext:
         all_deposits = client.frozen_deposits(bootstrap5)
         balance = client.get_mutez_balance('bootstrap5')
         assert balance + all_deposits == utils.mutez_of_tez(4000000.0)
+        # the sources differ, so both transfers can sit in the mempool
+        # together and be sealed by a single bake
         client.transfer(
             400000,
             'bootstrap5',
             'bootstrap1',
             ['--fee', '0', '--force-low-fee'],
         )
-        utils.bake(client)
         client.transfer(
             400000,
             'bootstrap1',
@@ -261,10 +313,11 @@ class TestRawContext:
         ) + all_deposits == utils.mutez_of_tez(4000000.0)
 
     def test_activate_accounts(self, client: Client, session):
+        # both activations can sit in the mempool together and be
+        # sealed by a single bake
         account = f"{ACCOUNT_PATH}/king_commitment.json"
         session['keys'] += ['king', 'queen']
         client.activate_account(session['keys'][3], account)
-        utils.bake(client)
         account = f"{ACCOUNT_PATH}/queen_commitment.json"
         client.activate_account(session['keys'][4], account)
         utils.bake(client)
@@ -282,59 +335,36 @@ class TestRawContext:
         assert show_foo.secret_key is not None
 
 
+# Non-originated contracts remembered by TestRememberContract
+NON_ORIGINATED_CONTRACTS = [
+    ("test", "KT1BuEZtb68c1Q4yjtckcNjGELqWt56Xyesc"),
+    ("test-2", "KT1TZCh8fmUbuDqFxetPWC2fsQanAHzLx4W9"),
+]
+
+
 @pytest.mark.incremental
 class TestRememberContract:
     @pytest.mark.parametrize(
         "contract_name,non_originated_contract_address",
-        [
-            ("test", "KT1BuEZtb68c1Q4yjtckcNjGELqWt56Xyesc"),
-            ("test-2", "KT1TZCh8fmUbuDqFxetPWC2fsQanAHzLx4W9"),
-        ],
+        NON_ORIGINATED_CONTRACTS,
     )
-    def test_non_originated_contract_no_forcing_not_saved_before(
+    def test_remember_contract_lifecycle(
         self,
         client,
         contract_name,
         non_originated_contract_address,
     ):
+        # remembering a contract that was not saved before succeeds
         client.remember_contract(contract_name, non_originated_contract_address)
 
-    # As it is always the same client, the contracts have been saved
-    # before
-    @pytest.mark.parametrize(
-        "contract_name,non_originated_contract_address",
-        [
-            ("test", "KT1BuEZtb68c1Q4yjtckcNjGELqWt56Xyesc"),
-            ("test-2", "KT1TZCh8fmUbuDqFxetPWC2fsQanAHzLx4W9"),
-        ],
-    )
-    def test_non_originated_contract_with_forcing_and_saved_before(
-        self,
-        client,
-        contract_name,
-        non_originated_contract_address,
-    ):
+        # as it is always the same client, the contract has now been
+        # saved: remembering it again succeeds when forcing...
         client.remember_contract(
             contract_name, non_originated_contract_address, force=True
         )
 
-    # As it is always the same client, the contracts have been saved
-    # before
-    @pytest.mark.parametrize(
-        "contract_name,non_originated_contract_address",
-        [
-            ("test", "KT1BuEZtb68c1Q4yjtckcNjGELqWt56Xyesc"),
-            ("test-2", "KT1TZCh8fmUbuDqFxetPWC2fsQanAHzLx4W9"),
-        ],
-    )
-    def test_non_originated_contract_no_forcing_and_saved_before(
-        self,
-        client,
-        contract_name,
-        non_originated_contract_address,
-    ):
+        # ...and fails without forcing
         expected_error = f"The contract alias {contract_name} already exists"
-
         with assert_run_failure(expected_error):
             client.remember_contract(
                 contract_name, non_originated_contract_address, force=False
@@ -385,15 +415,11 @@ class TestRememberContract:
     # Test that a large operation under 32KB can be injected in the node
     # (variant using a lambda with deep nesting).
     def test_operation_size_with_lambda_ok(self, client: Client):
-        # Each pair of braces is encoded on 5 bytes so this takes
-        # 5 * 6 * 1024 = 30 KB < 32KB
-        big_arg = ("{" * 6 * 1024) + ("}" * 6 * 1024)
-
         client.transfer(
             10,
             'bootstrap1',
             'munch',
-            ['--arg', big_arg, "--entrypoint", "lambda"],
+            ['--arg', LAMBDA_ARG_OK, "--entrypoint", "lambda"],
         )
         utils.bake(client)
 
@@ -401,87 +427,67 @@ class TestRememberContract:
     # and the error is not a stack overflow
     # (variant using a lambda with deep nesting).
     def test_operation_size_with_lambda_fail(self, client: Client):
-        # Each pair of braces is encoded on 5 bytes so this takes
-        # 5 * 7 * 1024 = 35 KB > 32KB
-        big_arg = ("{" * 7 * 1024) + ("}" * 7 * 1024)
-
         expected_error = "Oversized operation"
         with assert_run_failure(expected_error):
             client.transfer(
                 10,
                 'bootstrap1',
                 'munch',
-                ['--arg', big_arg, "--entrypoint", "lambda"],
+                ['--arg', LAMBDA_ARG_FAIL, "--entrypoint", "lambda"],
             )
 
     # Test that a large operation under 32KB can be injected in the node
     # (variant using a long list).
     def test_operation_size_with_list_ok(self, client: Client):
-        # Each element in the list takes 2 bytes so about 30KB in total
-        big_arg = "{" + ("0; " * 15 * 1024) + "}"
-
         client.transfer(
             10,
             'bootstrap1',
             'munch',
-            ['--arg', big_arg, "--entrypoint", "list_nat"],
+            ['--arg', LIST_ARG_OK, "--entrypoint", "list_nat"],
         )
         utils.bake(client)
 
     def test_operation_size_with_list_syntax_error(self, client: Client):
-        # Each element in the list takes 2 bytes so about 30KB in total
-        big_arg = "{" + ("0; " * 15 * 1024) + "'foo;'" + "}"
-
         expected_error = "transfer simulation failed"
         with assert_run_failure(expected_error):
             client.transfer(
                 10,
                 'bootstrap1',
                 'munch',
-                ['--arg', big_arg, "--entrypoint", "list_nat"],
+                ['--arg', LIST_ARG_SYNTAX_ERROR, "--entrypoint", "list_nat"],
             )
 
     def test_operation_size_with_list_ill_typed(self, client: Client):
-        # Each element in the list takes 2 bytes so about 30KB in total
-        big_arg = "{" + ("0; " * 15 * 1024) + "Unit;" + "}"
-
         expected_error = "transfer simulation failed"
         with assert_run_failure(expected_error):
             client.transfer(
                 10,
                 'bootstrap1',
                 'munch',
-                ['--arg', big_arg, "--entrypoint", "list_nat"],
+                ['--arg', LIST_ARG_ILL_TYPED, "--entrypoint", "list_nat"],
             )
 
     # Test that a large operation over 32KB cannot be injected in the node,
     # and the error is not a stack overflow
     # (variant using a long list).
     def test_operation_size_with_list_fail(self, client: Client):
-        # Each element in the list takes 2 bytes so about 34KB in total
-        big_arg = "{" + ("0; " * 17 * 1024) + "}"
-
         expected_error = "Oversized operation"
         with assert_run_failure(expected_error):
             client.transfer(
                 10,
                 'bootstrap1',
                 'munch',
-                ['--arg', big_arg, "--entrypoint", "list_nat"],
+                ['--arg', LIST_ARG_FAIL, "--entrypoint", "list_nat"],
             )
 
     # Test that a large operation under 32KB can be injected in the node
     # (variant using a big nat).
     def test_operation_size_with_nat_ok(self, client: Client):
-        # The encoding for nat uses a byte to encode 7 bits of the number
-        # so the size of 2 ** (7 * n) is about n bytes
-        big_arg = 2 ** (7 * 30 * 1024)
-
         client.transfer(
             10,
             'bootstrap1',
             'munch',
-            ['--arg', f"{big_arg}", "--entrypoint", "nat"],
+            ['--arg', f"{NAT_ARG_OK}", "--entrypoint", "nat"],
         )
         utils.bake(client)
 
@@ -489,15 +495,11 @@ class TestRememberContract:
     # and the error is not a stack overflow
     # (variant using a big nat).
     def test_operation_size_with_nat_fail(self, client: Client):
-        # The encoding for nat uses a byte to encode 7 bits of the number
-        # so the size of 2 ** (7 * n) is about n bytes
-        big_arg = 2 ** (7 * 33 * 1024)
-
         expected_error = "Oversized operation"
         with assert_run_failure(expected_error):
             client.transfer(
                 10,
                 'bootstrap1',
                 'munch',
-                ['--arg', f"{big_arg}", "--entrypoint", "nat"],
+                ['--arg', f"{NAT_ARG_FAIL}", "--entrypoint", "nat"],
             )
@@ -1,5 +1,4 @@
-import copy
-import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from tools import constants
 from launchers.sandbox import Sandbox
@@ -18,37 +17,55 @@ TEST_DURATION = 5 * ROUND_DURATION
 @pytest.mark.incremental
 @pytest.mark.tenderbake
 class TestProtoTenderbakeIncrementalStart:
-    """Run a number of nodes and start the bakers incrementally, each one
-    after one round duration more. After all bakers have been
+    """Run a number of nodes and start the bakers incrementally, each
+    one as soon as the previous one is up, so that the first levels are
+    baked with only part of the committee. After all bakers have been
     started, they should be able to reach a decision."""
 
     def test_init_nodes(self, sandbox: Sandbox):
-        for i in range(NUM_NODES):
-            sandbox.add_node(
-                i,
-                params=constants.NODE_PARAMS,
-                log_levels=constants.TENDERBAKE_NODE_LOG_LEVELS,
-            )
+        # the nodes are independent, add them concurrently
+        with ThreadPoolExecutor(max_workers=NUM_NODES) as executor:
+            futures = [
+                executor.submit(
+                    sandbox.add_node,
+                    i,
+                    params=constants.NODE_PARAMS,
+                    log_levels=constants.TENDERBAKE_NODE_LOG_LEVELS,
+                )
+                for i in range(NUM_NODES)
+            ]
+            for future in futures:
+                future.result()
 
     def test_start_some_bakers(self, sandbox: Sandbox):
-        for i in range(NUM_EARLY_START_NODES):
-            account = f'bootstrap{i + 1}'
-            sandbox.add_baker(
-                i,
-                [account],
-                proto=protocol.DAEMON,
-                log_levels=constants.TENDERBAKE_BAKER_LOG_LEVELS,
-            )
+        # the early bakers are independent, start them concurrently
+        with ThreadPoolExecutor(max_workers=NUM_EARLY_START_NODES) as executor:
+            futures = [
+                executor.submit(
+                    sandbox.add_baker,
+                    i,
+                    [f'bootstrap{i + 1}'],
+                    proto=protocol.DAEMON,
+                    log_levels=constants.TENDERBAKE_BAKER_LOG_LEVELS,
+                )
+                for i in range(NUM_EARLY_START_NODES)
+            ]
+            for future in futures:
+                future.result()
 
     def test_activate(self, sandbox):
-        proto_params = dict(protocol.TENDERBAKE_PARAMETERS)
-        parameters = copy.deepcopy(proto_params)
+        parameters = protocol.get_tenderbake_parameters()
         parameters['round_durations'] = ROUND_DURATIONS
         parameters['consensus_threshold'] = (
             2 * (parameters['consensus_threshold'] // 3) + 1
         )
 
-        time.sleep(2 * ROUND_DURATION)
+        # wait until the early bakers are actually up instead of
+        # sleeping for a fixed number of rounds
+        for i in range(NUM_EARLY_START_NODES):
+            sandbox.wait_for_baker_ready(
+                i, protocol.DAEMON, timeout=2 * ROUND_DURATION
+            )
         protocol.activate(
             sandbox.client(0),
             parameters=parameters,
@@ -63,10 +80,19 @@ class TestProtoTenderbakeIncrementalStart:
                 proto=protocol.DAEMON,
                 log_levels=constants.TENDERBAKE_BAKER_LOG_LEVELS,
             )
-            time.sleep(ROUND_DURATION)
+            # start the next baker as soon as this one is up, rather
+            # than after a fixed round duration
+            sandbox.wait_for_baker_ready(
+                i, protocol.DAEMON, timeout=ROUND_DURATION
+            )
 
-    def test_wait(self):
-        time.sleep(TEST_DURATION)
+    def test_wait(self, sandbox: Sandbox):
+        # wait for the cluster to actually reach the expected level
+        # instead of sleeping for the worst-case duration
+        sandbox.wait_for_level(
+            1 + TEST_DURATION // ROUND_DURATION,
+            timeout=TEST_DURATION + ROUND_DURATION,
+        )
 
     def test_level(self, sandbox):
         # a decision should be taken in the first round, so we can deduce at
@@ -75,7 +101,13 @@ class TestProtoTenderbakeIncrementalStart:
         for client in sandbox.all_clients():
             level = client.get_level()
             assert level >= expected_min_level
-            for i in range(level + 1):
-                if i > 1:
-                    block_round = client.get_tenderbake_round(level=str(i))
-                    assert block_round == 0
+            # query the round of every level in a single batch
+            responses = client.rpc_batch(
+                [
+                    ('get', f'/chains/main/blocks/{i}/helpers/round')
+                    for i in range(2, level + 1)
+                ]
+            )
+            for response in responses:
+                assert response.ok, response.text
+                assert int(response.json()) == 0